@@ -0,0 +1,23 @@
+# stdlib imports
+import json
+import typing
+
+# vendor imports
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# local imports
+
+
+def loads(data: typing.Union[bytes, str]) -> typing.Any:
+    """
+    Parse JSON data, using `orjson` if it is installed.
+
+    Falls back to the stdlib `json` module otherwise. Both accept the raw
+    bytes of a document, so callers needn't decode it first.
+    """
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -6,13 +6,20 @@ This module provides helper functions for my Advent of Code solutions.
 import functools
 import pathlib
 
-# vendor imports
-import click
-import colorama
-from colorama import Fore, Style
+# vendor imports (`click` and `colorama`) are deferred until first use, so
+# solutions that never print anything don't pay for them at startup
+_colorInitialized = False
 
-# Initialize colorama
-colorama.init()
+
+def _initColor():
+    """ Initialize colorama on first use, and return the module """
+    global _colorInitialized
+    import colorama
+
+    if not _colorInitialized:
+        colorama.init()
+        _colorInitialized = True
+    return colorama
 
 
 def solution(func):
@@ -20,6 +27,7 @@ def solution(func):
     Wrapper func making a solution function have a fully-featured CLI, with
     a pre-configured puzzle input file argument.
     """
+    import click
 
     @click.command()
     @click.argument("path", type=str)
@@ -40,13 +48,18 @@ def solution(func):
 
 def printAnswer(part: int, value: any) -> None:
     """ Print the solution to Part `part` of the puzzle """
-    print(f"{Fore.GREEN}Answer (Part {part}):{Style.RESET_ALL} {value}")
+    color = _initColor()
+    print(
+        f"{color.Fore.GREEN}Answer (Part {part}):{color.Style.RESET_ALL} "
+        f"{value}"
+    )
 
 
 def printComputationWarning() -> None:
     """ Print a warning about computation time. """
+    color = _initColor()
     print(
-        f"{Fore.YELLOW}Warning:{Style.RESET_ALL} "
+        f"{color.Fore.YELLOW}Warning:{color.Style.RESET_ALL} "
         "It may take awhile to compute answers..."
     )
 
@@ -56,8 +69,11 @@ def printComputationWarningWithPrompt() -> None:
     Print a warning about computation time,
     prompting the user to continue.
     """
+    import click
+
+    color = _initColor()
     click.confirm(
-        f"{Fore.YELLOW}Warning:{Style.RESET_ALL} "
+        f"{color.Fore.YELLOW}Warning:{color.Style.RESET_ALL} "
         "It may take a very long while to compute answers. Continue?",
         default=True,
         abort=True,
@@ -66,5 +82,6 @@ def printComputationWarningWithPrompt() -> None:
 
 def printError(message: str) -> None:
     """ Print an error in red and abort execution """
-    print(f"{Fore.RED}{message}{Style.RESET_ALL}")
+    color = _initColor()
+    print(f"{color.Fore.RED}{message}{color.Style.RESET_ALL}")
     exit(1)
@@ -3,7 +3,6 @@ import datetime
 import logging
 import os
 import pathlib
-import json
 import random
 import re
 import secrets
@@ -11,15 +10,20 @@ import sys
 import uuid as uuidModule
 
 # local imports
+from ._json import loads as _loadJson
 from .types import FrozenNamespace
 
 ### CONSTANTS ###
-# Dictionary of extra json encoder options
-_jsonOptions = {"sort_keys": True, "indent": 2}
-
 # Parent directory name for app data
 PARENT_DIRECTORY_NAME = ".chassis"
 
+# Pattern matching characters stripped from log file names
+_nonWordPattern = re.compile(r"\W")
+
+# Cache of parsed props files, keyed by path. Values are tuples of the file's
+# size and modification time (in ns), and the parsed contents.
+_propsCache: dict[pathlib.Path, tuple[tuple[int, int], dict]] = {}
+
 
 class _PropKey:
     def __init__(self, store, key):
@@ -60,33 +64,47 @@ class _PropStore:
     ):
         # Store the args away for future use
         self._path = propsFile
-        self._keys = defaultValues.keys()
         self._defaults = defaultValues
         self._overrides = overrideValues
 
-        # If the props file does not exist, create an empty one
-        if not propsFile.exists():
-            with propsFile.open("w") as fileHandle:
-                json.dump({}, fileHandle)
-
-        # Load up the props file and parse it
-        with propsFile.open("r") as fileHandle:
-            self._store = json.load(fileHandle)
+        # Create the key accessors once, so lookups don't allocate new ones
+        self._propKeys = {key: _PropKey(self, key) for key in defaultValues}
+
+        # Load up the props file and parse it, reusing the parsed contents
+        # from an earlier store if the file hasn't been modified since. If the
+        # props file does not exist, create an empty one.
+        try:
+            propsStat = propsFile.stat()
+        except FileNotFoundError:
+            propsFile.parent.mkdir(parents=True, exist_ok=True)
+            propsFile.write_bytes(b"{}")
+            self._store = {}
+        else:
+            # The size is checked too, as on filesystems with coarse
+            # timestamps an edit may not change the modification time
+            version = (propsStat.st_size, propsStat.st_mtime_ns)
+            cached = _propsCache.get(propsFile)
+            if cached and cached[0] == version:
+                self._store = cached[1]
+            else:
+                rawData = propsFile.read_bytes()
+                self._store = _loadJson(rawData) if rawData.strip() else {}
+                _propsCache[propsFile] = (version, self._store)
 
     def __getattr__(self, key):
         # normal = self._normalize(key)
-        if key in self._keys:
-            return self.__getitem__(key)
+        if key in self._propKeys:
+            return self._propKeys[key]
         return super().__getattribute__(key)
 
     def __getitem__(self, key):
         # normal = self._normalize(key)
-        if key in self._keys:
-            return _PropKey(self, key)
+        if key in self._propKeys:
+            return self._propKeys[key]
         raise KeyError(f'Key "{key}" does not exist in the store')
 
     def __iter__(self):
-        return self._keys.__iter__()
+        return self._propKeys.__iter__()
 
     def _getValue(self, key):
         if key in self._overrides:
@@ -231,7 +249,7 @@ class Chassis:
         chassisSession.logPath = (
             chassisStore.path
             / "logs"
-            / re.sub(r"\W", "", chassisSession.opened.isoformat())
+            / _nonWordPattern.sub("", chassisSession.opened.isoformat())
         ).with_suffix(".log")
         if features.get("log", False):
             chassisSession.logPath.parent.mkdir(exist_ok=True)
@@ -5,26 +5,38 @@ class VIG256(object):
         self.keyLen = len(key)
         self.resetCounter()
 
+        # Build the byte translation tables for each key value up front
+        self._encryptTables = [self._buildTable(k) for k in key]
+        self._decryptTables = [self._buildTable(-k) for k in key]
+
+    @staticmethod
+    def _buildTable(shift: int) -> bytes:
+        return bytes((value + shift) % 256 for value in range(256))
+
     def resetCounter(self):
         self.counter = 0
 
-    def encryptChunk(self, chunk: bytes) -> bytes:
+    def _transformChunk(self, chunk: bytes, tables: list[bytes]) -> bytes:
+        """
+        Shift every byte in a chunk by its rolling key value.
+
+        Bytes sharing a key offset are processed together as a single stride,
+        so the per-byte work happens in C via `bytes.translate`.
+        """
         chunkLen = len(chunk)
-        chunkOut = bytearray()
-        for i, value in enumerate(chunk):
-            keyValue = self.key[(self.counter + i) % self.keyLen]
-            chunkOut.append((value + keyValue) % 256)
+        chunkOut = bytearray(chunkLen)
+        for i in range(min(chunkLen, self.keyLen)):
+            table = tables[(self.counter + i) % self.keyLen]
+            stride = slice(i, None, self.keyLen)
+            chunkOut[stride] = chunk[stride].translate(table)
         self.counter += chunkLen
         return chunkOut
 
+    def encryptChunk(self, chunk: bytes) -> bytes:
+        return self._transformChunk(chunk, self._encryptTables)
+
     def decryptChunk(self, chunk: bytes) -> bytes:
-        chunkLen = len(chunk)
-        chunkOut = bytearray()
-        for i, value in enumerate(chunk):
-            keyValue = self.key[(self.counter + i) % self.keyLen]
-            chunkOut.append((value - keyValue + 256) % 256)
-        self.counter += chunkLen
-        return chunkOut
+        return self._transformChunk(chunk, self._decryptTables)
 
 
 testinput = b"                                                "
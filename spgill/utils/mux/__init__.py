@@ -1,11 +1,13 @@
 import os
-import rich
 import sys
 
 if (
     not os.environ.get("SPGILL_UTILS_MUX_SUPPRESS_WARNING", "").lower()
     == "true"
 ):
+    # rich is only needed to print the warning, so import it here
+    import rich
+
     rich.print(
         "[yellow][italic]Warning:[/italic] The `spgill.utils.mux.*` modules have been deprecated. Consider replacing these modules in your\n"
         "script with their newer counterparts; they provide much stronger type annotations and improved workflows.\n"
@@ -3,20 +3,24 @@ THIS MODULE IS DEPRECATED. USE `spgill.utils.media.edit` INSTEAD.
 """
 
 ### stdlib imports
+import collections
+import concurrent.futures
+import contextlib
 import enum
+import os
 import pathlib
+import shutil
+import subprocess
+import tempfile
 import typing
 
-### vendor imports
-import sh
-
 ### local imports
 import spgill.utils.mux.info as info
 import spgill.utils.mux.merge as merge
 
 
 # Commands
-mkvpropedit = sh.Command("mkvpropedit")
+mkvpropeditPath = shutil.which("mkvpropedit") or "mkvpropedit"
 
 
 class EditContainerOptions(typing.TypedDict, total=False):
@@ -35,6 +39,10 @@ class EditTagSelector(enum.Enum):
     Global = "global"
 
 
+# Tag and chapter files can be given as a path, or as the raw XML content
+EditXMLSource = typing.Union[pathlib.Path, bytes]
+
+
 class EditJob:
     # List of track types accepted as mux sources
     _acceptedTrackTypes: list[info.MediaTrackType] = [
@@ -45,23 +53,70 @@ class EditJob:
 
     def __init__(self, container: info.MediaFile) -> None:
         self._container = container
+        self._containerPath = container.path
 
         # Sanity check that this is an MKV container. No other formats are supported.
-        assert container.meta.Format == "Matroska"
+        containerFormat = container.meta.Format if container.meta else ""
+        if containerFormat != "Matroska":
+            raise RuntimeError(
+                f"Container of type '{containerFormat}' is not supported by edit jobs."
+            )
 
         # Setup instance vars
-        self._tagOptions: dict[
-            typing.Union[EditTagSelector, info.MediaTrack],
-            typing.Optional[pathlib.Path],
-        ] = {}
+        # Tag options are keyed by their final selector argument
+        self._tagOptions: dict[str, typing.Optional[EditXMLSource]] = {}
         self._chapterOption: typing.Optional[
-            typing.Union[bool, pathlib.Path]
+            typing.Union[bool, EditXMLSource]
         ] = False
         self._containerOptions: EditContainerOptions = {}
-        self._trackOptions: dict[info.MediaTrack, EditTrackOptions] = {}
+        self._trackOptions: dict[
+            info.MediaTrack, EditTrackOptions
+        ] = collections.defaultdict(dict)
+
+        # Paths of in-memory XML content, populated for the duration of `run`
+        self._payloadPaths: dict[int, str] = {}
+
+        # Snapshot the selector argument of every editable track up front.
+        # Keyed by `id()`, as hashing a `MediaTrack` hashes all of its fields.
+        self._trackSelectors: dict[int, str] = {
+            id(track): f"track:{track.ID + 1}"
+            for track in container.tracks
+            if track.Type in self._acceptedTrackTypes
+        }
+
+        # Identities of every track in the container, for membership checks
+        # that don't compare each track field-by-field
+        self._trackIds: frozenset[int] = frozenset(
+            id(track) for track in container.tracks
+        )
+
+    @classmethod
+    def fromPaths(
+        cls, paths: typing.Iterable[pathlib.Path], maxWorkers: int = 32
+    ) -> list["EditJob"]:
+        """
+        Create edit jobs for many container files at once.
+
+        The containers are probed concurrently (up to `maxWorkers` at a time),
+        which matters most when the files live on network storage. Jobs are
+        returned in the same order as the input paths.
+        """
+        return [
+            cls(container)
+            for container in info.MediaFile.openMany(paths, maxWorkers)
+        ]
+
+    def _trackSelector(self, track: info.MediaTrack) -> str:
+        try:
+            return self._trackSelectors[id(track)]
+        except KeyError:
+            raise RuntimeError(
+                "The given track is not an editable track of the container you are trying to edit!\n",
+                track,
+            )
 
     def _ensureTrackIsValid(self, track: info.MediaTrack):
-        if track not in self._container.tracks:
+        if id(track) not in self._trackIds:
             raise RuntimeError(
                 "The given track is not found in the container you are trying to edit!\n",
                 track,
@@ -75,44 +130,94 @@ class EditJob:
     def setTags(
         self,
         selector: typing.Union[EditTagSelector, info.MediaTrack],
-        path: typing.Optional[pathlib.Path],
+        path: typing.Optional[EditXMLSource],
     ) -> None:
         """
         Set tag options for the all tracks, the container, or a specific track.
 
-        If value is `None` the tracks will be cleared for the selector.
+        The tags can be a path to an XML file, or the XML content itself as
+        bytes. If value is `None` the tracks will be cleared for the selector.
         """
         if isinstance(selector, info.MediaTrack):
             self._ensureTrackIsValid(selector)
-        self._tagOptions[selector] = path
-
-    def _generateTagArguments(self) -> list[str, pathlib.Path]:
-        arguments: list[str] = []
-        for selector, value in self._tagOptions.items():
-            selectorArg = ""
-            if isinstance(selector, EditTagSelector):
-                selectorArg = selector.value
-            else:
-                selectorArg = f"track:{selector.ID + 1}"
-            valueArg = "" if value is None else value
-            arguments += ["--tags", f"{selectorArg}:{valueArg}"]
-        return arguments
+            self._tagOptions[self._trackSelector(selector)] = path
+        else:
+            self._tagOptions[selector.value] = path
 
-    def setChapters(self, value: typing.Optional[pathlib.Path]) -> None:
+    def _generateTagArguments(
+        self, arguments: list[typing.Union[str, pathlib.Path]]
+    ) -> None:
+        for selectorArg, value in self._tagOptions.items():
+            valueArg = "" if value is None else self._xmlSourceArgument(value)
+            arguments.append("--tags")
+            arguments.append(f"{selectorArg}:{valueArg}")
+
+    def setChapters(self, value: typing.Optional[EditXMLSource]) -> None:
         """
         Set chapters on the container.
 
         A path (to an XML file) will update the container with the chapters within,
-        a value of `None` will clear all chapters from the container.
+        as will the XML content itself given as bytes. A value of `None` will
+        clear all chapters from the container.
         """
         self._chapterOption = value
 
-    def _generateChapterArguments(self) -> list[str, pathlib.Path]:
+    def _xmlSourceArgument(
+        self, value: EditXMLSource
+    ) -> typing.Union[str, pathlib.Path]:
+        if isinstance(value, bytes):
+            return self._payloadPaths[id(value)]
+        return value
+
+    @contextlib.contextmanager
+    def _preparePayloads(self) -> typing.Iterator[list[int]]:
+        """
+        Make any in-memory XML content readable by `mkvpropedit`.
+
+        Where supported (Linux), the content is written to anonymous memory
+        files that are passed to the process as `/dev/fd/N` paths, so nothing
+        touches the disk. Elsewhere, temporary files are used instead.
+
+        Yields the list of file descriptors the process needs to inherit.
+        """
+        payloads = [
+            value
+            for value in [*self._tagOptions.values(), self._chapterOption]
+            if isinstance(value, bytes)
+        ]
+        fds: list[int] = []
+        tempPaths: list[pathlib.Path] = []
+        try:
+            for payload in payloads:
+                if hasattr(os, "memfd_create"):
+                    fd = os.memfd_create("mkvpropedit-payload")
+                    fds.append(fd)
+                    with open(fd, "wb", closefd=False) as handle:
+                        handle.write(payload)
+                    self._payloadPaths[id(payload)] = f"/dev/fd/{fd}"
+                else:
+                    with tempfile.NamedTemporaryFile(
+                        "wb", suffix=".xml", delete=False
+                    ) as handle:
+                        handle.write(payload)
+                    tempPaths.append(pathlib.Path(handle.name))
+                    self._payloadPaths[id(payload)] = handle.name
+            yield fds
+        finally:
+            self._payloadPaths.clear()
+            for fd in fds:
+                os.close(fd)
+            for tempPath in tempPaths:
+                tempPath.unlink(missing_ok=True)
+
+    def _generateChapterArguments(
+        self, arguments: list[typing.Union[str, pathlib.Path]]
+    ) -> None:
         if self._chapterOption is False:
-            return []
-        return ["--chapters"] + (
-            [] if self._chapterOption is None else [self._chapterOption]
-        )
+            return
+        arguments.append("--chapters")
+        if self._chapterOption is not None:
+            arguments.append(self._xmlSourceArgument(self._chapterOption))
 
     def setContainerOptions(self, options: EditContainerOptions = {}):
         """Set container options for editing"""
@@ -120,21 +225,22 @@ class EditJob:
 
     def _formatPropertyEdit(
         self, key: str, value: typing.Optional[typing.Union[str, int, bool]]
-    ) -> list[str]:
+    ) -> tuple[str, str]:
         if value is None:
-            return ["--delete", key]
+            return ("--delete", key)
         elif isinstance(value, bool):
-            return ["--set", f"flag-{key}={int(value)}"]
+            return ("--set", f"flag-{key}={int(value)}")
         elif isinstance(value, (str, int)):
-            return ["--set", f"{key}={value}"]
+            return ("--set", f"{key}={value}")
 
-    def _generateContainerArguments(self) -> list[str]:
-        arguments: list[str] = (
-            ["--edit", "info"] if self._containerOptions else []
-        )
+    def _generateContainerArguments(
+        self, arguments: list[typing.Union[str, pathlib.Path]]
+    ) -> None:
+        if self._containerOptions:
+            arguments.append("--edit")
+            arguments.append("info")
         for key, value in self._containerOptions.items():
-            arguments += self._formatPropertyEdit(key, value)
-        return arguments
+            arguments.extend(self._formatPropertyEdit(key, value))
 
     def setTrackOptions(
         self,
@@ -157,27 +263,31 @@ class EditJob:
         track: info.MediaTrack,
         options: EditTrackOptions,
     ) -> None:
-        if track not in self._trackOptions:
-            self._trackOptions[track] = {}
         self._trackOptions[track].update(options)
 
-    def _generateTrackArguments(self) -> list[str, pathlib.Path]:
-        arguments: list[str] = []
+    def _generateTrackArguments(
+        self, arguments: list[typing.Union[str, pathlib.Path]]
+    ) -> None:
+        formatPropertyEdit = self._formatPropertyEdit
         for track, options in self._trackOptions.items():
             if options:
-                arguments += ["--edit", f"track:{track.ID + 1}"]
+                arguments.append("--edit")
+                arguments.append(self._trackSelector(track))
             for key, value in options.items():
-                arguments += self._formatPropertyEdit(key, value)
-        return arguments
+                arguments.extend(formatPropertyEdit(key, value))
 
-    def _generateCommandArguments(self) -> list[str, pathlib.Path]:
-        return [
-            self._container.path,
-            *self._generateTagArguments(),
-            *self._generateChapterArguments(),
-            *self._generateContainerArguments(),
-            *self._generateTrackArguments(),
+    def _generateCommandArguments(
+        self,
+    ) -> list[typing.Union[str, pathlib.Path]]:
+        # All of the argument generators append into this one list
+        arguments: list[typing.Union[str, pathlib.Path]] = [
+            self._containerPath
         ]
+        self._generateTagArguments(arguments)
+        self._generateChapterArguments(arguments)
+        self._generateContainerArguments(arguments)
+        self._generateTrackArguments(arguments)
+        return arguments
 
     def autoAssignDefaultFlags(self):
         """Iterate through the tracks in the container and re-assign default flags."""
@@ -192,6 +302,55 @@ class EditJob:
                 track, typing.cast(EditTrackOptions, trackOptions)
             )
 
-    def run(self, fg: bool = True) -> sh.RunningCommand:
-        """Execute the header edit operation now."""
-        return mkvpropedit(self._generateCommandArguments(), _fg=fg)
+    def run(self, fg: bool = True) -> subprocess.CompletedProcess:
+        """
+        Execute the header edit operation now.
+
+        If `fg` is False, the output of the command is captured instead of
+        being forwarded to the terminal.
+
+        If no options have been set on the job, `mkvpropedit` is not run at all
+        and an empty, successful result is returned, as the command would fail
+        with "Nothing to do."
+        """
+        # Keep this call eligible for `posix_spawn`, which avoids copying the
+        # page tables of large parent processes. That requires an absolute
+        # executable path and no `preexec_fn`, `cwd`, or fds to pass, and
+        # `close_fds` must be off (safe, as Python's own fds are never
+        # inheritable). XML payloads need `pass_fds`, so fall back to fork.
+        with self._preparePayloads() as payloadFds:
+            arguments = [mkvpropeditPath, *self._generateCommandArguments()]
+
+            # Only the container path, so no options were set
+            if len(arguments) == 2:
+                output = None if fg else b""
+                return subprocess.CompletedProcess(
+                    arguments, 0, output, output
+                )
+
+            return subprocess.run(
+                arguments,
+                check=True,
+                stdout=None if fg else subprocess.PIPE,
+                stderr=None if fg else subprocess.PIPE,
+                close_fds=bool(payloadFds),
+                pass_fds=payloadFds,
+            )
+
+    @staticmethod
+    def runMany(
+        jobs: typing.Iterable["EditJob"], workers: typing.Optional[int] = None
+    ) -> list[subprocess.CompletedProcess]:
+        """
+        Execute many header edit operations concurrently.
+
+        Each job still gets its own `mkvpropedit` process, but up to `workers`
+        of them (defaults to the CPU count) will run at the same time. Output
+        of the processes is not forwarded to the terminal.
+
+        Results are returned in the same order as the input jobs.
+        """
+        with concurrent.futures.ThreadPoolExecutor(
+            workers or os.cpu_count()
+        ) as executor:
+            return list(executor.map(lambda job: job.run(fg=False), jobs))
@@ -3,34 +3,64 @@ THIS MODULE IS DEPRECATED. USE `spgill.utils.media.info` INSTEAD.
 """
 
 ### stdlib imports
+import ast
 import base64
+import builtins
+import concurrent.futures
+import contextlib
 import dataclasses
 import enum
+import functools
+import os
 import pathlib
-import re
-import json
+import shutil
+import sqlite3
+import stat
+import subprocess
+import sys
+import threading
 import typing
+import zlib
 
 ### vendor imports
-import charset_normalizer
 import sh
 
+try:
+    import pymediainfo
+except ImportError:
+    pymediainfo = None
+
+### local imports
+from spgill.utils._json import loads as loadJson
+
 
 # Commands
-mediainfo = sh.Command("mediainfo")
+mediainfoPath = shutil.which("mediainfo") or "mediainfo"
 mkvextract = sh.Command("mkvextract")
 
-# Constants
-trackSelectorFragmentPattern = re.compile(r"^([-+]?)(.*)$")
-commaDelimitedNumbersPattern = re.compile(
-    r"^(?:(?:(?<!^),)?(?:(?:-?\d+)?(?:(?<=\d)\:|\:(?=-?\d))(?:-?\d+)?|-?\d+))+$"
+# Location of the persistent cache of mediainfo output
+probeCachePath = (
+    pathlib.Path(os.environ.get("XDG_CACHE_HOME", "~/.cache")).expanduser()
+    / "spgill"
+    / "mux-info.sqlite3"
 )
 
+# In-process memo of mediainfo output for recently opened files, keyed by the
+# file's path, size, and modification time (in ns). Entries are kept in order
+# of use, so the least recently used are evicted first once it holds
+# `_probeMemoSize` of them.
+_probeMemo: dict[tuple[pathlib.Path, int, int], typing.Union[bytes, str]] = {}
+_probeMemoSize = 128
+_probeMemoLock = threading.Lock()
+
 
 def guessSubtitleCharset(
     path: pathlib.Path, ignoreLowConfidence: bool = False
 ) -> str:
     """Guess the charset of a subtitle file. MUST be a text subtitle file."""
+    # Only imported when needed, as it is slow to import
+    import charset_normalizer
+
     with path.open("rb") as handle:
         results = charset_normalizer.detect(handle.read())
 
@@ -42,6 +72,232 @@ def guessSubtitleCharset(
     return results["encoding"]
 
 
+def _isIndex(value: str) -> bool:
+    return value.removeprefix("-").isdecimal()
+
+
+def _parseIndexSelector(
+    selector: str,
+) -> typing.Optional[list[typing.Union[int, slice]]]:
+    """
+    Parse a comma-delimited list of track indexes and ranges.
+
+    Returns `None` if the selector is not such a list.
+    """
+    arguments: list[typing.Union[int, slice]] = []
+    for argument in selector.split(","):
+        rangeStart, colon, rangeEnd = argument.partition(":")
+
+        # Without a colon, the argument must be a single index number
+        if not colon:
+            if not _isIndex(argument):
+                return None
+            arguments.append(int(argument))
+
+        # Else it's a range, which needs at least one of its bounds
+        elif (
+            (rangeStart or rangeEnd)
+            and (not rangeStart or _isIndex(rangeStart))
+            and (not rangeEnd or _isIndex(rangeEnd))
+        ):
+            arguments.append(
+                slice(
+                    int(rangeStart) if rangeStart else None,
+                    int(rangeEnd) if rangeEnd else None,
+                )
+            )
+
+        else:
+            return None
+
+    return arguments
+
+
+@functools.cache
+def _canUseLibmediainfo() -> bool:
+    """Check (once) whether libmediainfo can be used through `pymediainfo`."""
+    return pymediainfo is not None and pymediainfo.MediaInfo.can_parse()
+
+
+def _probeMediaInfo(path: pathlib.Path) -> typing.Union[bytes, str]:
+    """
+    Return the JSON mediainfo output for a media file.
+
+    If `pymediainfo` is installed (and can find libmediainfo), the file is
+    probed in-process, saving the cost of spawning a `mediainfo` process for
+    every file. Otherwise the `mediainfo` command is used.
+    """
+    if _canUseLibmediainfo():
+        # Same options as the command's defaults
+        return pymediainfo.MediaInfo.parse(path, full=False, output="JSON")
+
+    # The command is run directly rather than through `sh`, so the output is
+    # read straight from the pipe as bytes (no reader threads or decoding).
+    # Like `EditJob.run`, this stays eligible for `posix_spawn`.
+    return subprocess.run(
+        [mediainfoPath, "--output=JSON", path],
+        check=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        close_fds=False,
+    ).stdout
+
+
+def _openProbeCache() -> sqlite3.Connection:
+    probeCachePath.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(probeCachePath, timeout=30)
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS probes "
+        "(path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, data BLOB)"
+    )
+    return connection
+
+
+def _probeMediaInfoCached(
+    path: pathlib.Path, fileStat: os.stat_result
+) -> bytes:
+    """
+    Return the JSON mediainfo output for a media file, using the persistent
+    probe cache.
+
+    Cache entries are keyed by the file's absolute path, and are only reused
+    while its size and modification time are unchanged. The output is stored
+    compressed.
+    """
+    key = (str(path), fileStat.st_size, fileStat.st_mtime_ns)
+
+    with contextlib.closing(_openProbeCache()) as cache:
+        row = cache.execute(
+            "SELECT data FROM probes WHERE path = ? AND size = ? AND mtime = ?",
+            key,
+        ).fetchone()
+        if row is not None:
+            return zlib.decompress(row[0])
+
+        infoOutput = _probeMediaInfo(path)
+        if isinstance(infoOutput, str):
+            infoOutput = infoOutput.encode()
+
+        # Failed probes are not cached
+        if infoOutput:
+            with cache:
+                cache.execute(
+                    "INSERT OR REPLACE INTO probes VALUES (?, ?, ?, ?)",
+                    (*key, zlib.compress(infoOutput)),
+                )
+        return infoOutput
+
+
+def _probeMediaInfoMemoized(
+    path: pathlib.Path, fileStat: os.stat_result, useCache: bool
+) -> typing.Union[bytes, str]:
+    """
+    Return the JSON mediainfo output for a media file, memoized in-process so
+    repeated opens of a file don't probe it again.
+
+    The memo is keyed by the file's size and modification time (from
+    `fileStat`)
+    as well as its path, so that files are probed again once they are
+    modified. `useCache` only decides where the output comes from on a miss,
+    so it doesn't matter which setting a file was first opened with.
+    """
+    key = (path, fileStat.st_size, fileStat.st_mtime_ns)
+    with _probeMemoLock:
+        # Hits are moved to the end, making them the last to be evicted
+        if (infoOutput := _probeMemo.pop(key, None)) is not None:
+            _probeMemo[key] = infoOutput
+            return infoOutput
+
+    infoOutput = (
+        _probeMediaInfoCached(path, fileStat)
+        if useCache
+        else _probeMediaInfo(path)
+    )
+
+    # Failed probes are not memoized
+    if infoOutput:
+        with _probeMemoLock:
+            _probeMemo[key] = infoOutput
+            while len(_probeMemo) > _probeMemoSize:
+                del _probeMemo[next(iter(_probeMemo))]
+    return infoOutput
+
+
+@functools.lru_cache(maxsize=256)
+def _compileSelectorExpression(
+    expression: str,
+) -> tuple[typing.Callable[..., typing.Any], tuple[str, ...]]:
+    """
+    Compile a track selector expression into a function.
+
+    Returns the function, and the names of the selector values it takes as
+    arguments (the ones the expression references). Selector values are read
+    as function arguments (fast locals) instead of being looked up in a
+    mapping.
+
+    Results are cached, so a selector reused for many containers (or fragment
+    reused within a selector) is only compiled once.
+    """
+    try:
+        expressionTree = ast.parse(expression, "<selector>", "eval")
+    except (SyntaxError, ValueError) as error:
+        # Null bytes raise a `ValueError` on some Python versions
+        reason = error.msg if isinstance(error, SyntaxError) else error
+        raise RuntimeError(
+            f"Could not compile selector expression '{expression}' ({reason}). Re-examine your selector syntax."
+        ) from None
+
+    # Only a whitelist of syntax is accepted (see `_checkSelectorNode`), so
+    # an expression can't reach anything beyond its selector values.
+    referencedNames: set[str] = set()
+    for node in ast.walk(expressionTree):
+        if isinstance(node, ast.Name):
+            referencedNames.add(node.id)
+        if reason := _checkSelectorNode(node):
+            raise RuntimeError(
+                f"Selector expression '{expression}' {reason}, which is not allowed. Re-examine your selector syntax."
+            )
+
+    parameterNames = tuple(
+        sorted(referencedNames.intersection(_selectorValueBuilders))
+    )
+
+    # Wrap the expression in a lambda taking the selector values it uses.
+    # The tree is built directly, so the expression text is never re-parsed.
+    functionTree = ast.Expression(
+        body=ast.Lambda(
+            args=ast.arguments(
+                posonlyargs=[],
+                args=[ast.arg(arg=name) for name in parameterNames],
+                kwonlyargs=[],
+                kw_defaults=[],
+                defaults=[],
+            ),
+            body=expressionTree.body,
+        )
+    )
+    ast.fix_missing_locations(functionTree)
+    selectorFunction = eval(
+        compile(functionTree, "<selector>", "eval"), _selectorGlobals
+    )
+    return selectorFunction, parameterNames
+
+
+# Language codes (lowercased) that count as English for selectors
+_englishLanguageCodes: frozenset[str] = frozenset(("en", "eng"))
+
+# Selector flags set when their substring is found in a track's codec ID
+_codecFlags: list[tuple[str, str]] = [
+    ("isHEVC", "hevc"),
+    ("isAVC", "avc"),
+    ("isAAC", "aac"),
+    ("isAC3", "_ac3"),
+    ("isEAC3", "eac3"),
+    ("isDTS", "dts"),
+    ("isTrueHD", "truehd"),
+]
+
+
 # Cast methods
 def _castYesNo(value: str) -> bool:
     return value.lower() == "yes"
@@ -64,6 +320,22 @@ class MediaTrackType(enum.Enum):
     Subtitles = "Text"
 
 
+# Track types keyed by their mediainfo value, to skip the enum call machinery
+_trackTypesByValue: dict[str, MediaTrackType] = {
+    trackType.value: trackType for trackType in MediaTrackType
+}
+
+
+def _castTrackType(value: typing.Union[str, MediaTrackType]) -> MediaTrackType:
+    # Tracks created directly (e.g. by `SRTFile`) may already hold a member
+    if isinstance(value, MediaTrackType):
+        return value
+    try:
+        return _trackTypesByValue[value]
+    except KeyError:
+        raise ValueError(f"{value!r} is not a valid MediaTrackType")
+
+
 class MediaTrackSelectorValues(typing.TypedDict):
     # Convenience values
     track: "MediaTrack"
@@ -218,7 +490,7 @@ class MediaTrack:
     # the types defined above
     _castMethodMap: typing.ClassVar[dict[str, typing.Callable]] = {
         "ID": _convertToZeroIndex,
-        "Type": MediaTrackType,
+        "Type": _castTrackType,
         "TypeOrder": int,
         ###
         "AlternateGroup": int,
@@ -259,8 +531,13 @@ class MediaTrack:
     }
 
     def __post_init__(self) -> None:
-        # Iterate through all defined fields and and cast to the correct type
-        for key, value in dataclasses.asdict(self).items():
+        # Iterate through all defined fields and and cast to the correct type.
+        # Values are read directly, as `dataclasses.asdict` would deep copy
+        # every one of them (including the container and raw info).
+        for field in dataclasses.fields(self):
+            key = field.name
+            value = getattr(self, key)
+
             # Some long string values may be base64 encoded by mediainfo
             if isinstance(value, dict) and "@dt" in value:
                 value = base64.b64decode(value["#value"]).decode()
@@ -290,127 +567,476 @@ class MediaTrack:
         """
         self.container.extractTracks([(self, path)], fg)
 
+    # Lowercased strings matched by the selector values, computed only once
+    @functools.cached_property
+    def _codecLower(self) -> str:
+        return (self.CodecID or "").lower()
+
+    @functools.cached_property
+    def _titleLower(self) -> str:
+        return (self.Title or "").lower()
+
+    @functools.cached_property
+    def _hdrFormatLower(self) -> str:
+        # Only video tracks carry HDR metadata, so skip building it otherwise
+        if self.Type is not MediaTrackType.Video:
+            return ""
+        return (
+            (self.HDR_Format or "")
+            + " "
+            + (self.HDR_Format_Compatibility or "")
+        ).lower()
+
+    @functools.cached_property
+    def _selectorValueCache(self) -> dict[str, typing.Any]:
+        # Selector values already built for this track, keyed by name
+        return {}
+
     def getSelectorValues(
-        self,
+        self, names: typing.Optional[typing.Iterable[str]] = None
     ) -> MediaTrackSelectorValues:
         """
         Return a dictionary mapping of key value pairs for a given track.
 
         The keys are the flags (i.e., locals) used in the track selector methods.
+        If `names` is given, only the values of those keys are returned (unknown
+        names are ignored).
+
+        Each value is only computed once per track, and is reused by later
+        calls. A new dictionary is returned every time, so it is safe to modify.
         """
-        hdrFormat = (
-            (self.HDR_Format or "")
-            + " "
-            + (self.HDR_Format_Compatibility or "")
-        ).lower()
+        cache = self._selectorValueCache
+        values = {}
+        for name in _selectorValueBuilders if names is None else names:
+            if name not in cache:
+                build = _selectorValueBuilders.get(name, None)
+                if build is None:
+                    continue
+                cache[name] = build(self)
+            values[name] = cache[name]
+        return typing.cast(MediaTrackSelectorValues, values)
+
+
+# Global namespace of selector expressions. Only a subset of builtins without
+# side effects (or access to attributes by name) is available.
+_selectorGlobals: dict[str, typing.Any] = {
+    "__builtins__": {
+        name: getattr(builtins, name)
+        for name in (
+            "abs",
+            "all",
+            "any",
+            "bool",
+            "dict",
+            "enumerate",
+            "filter",
+            "float",
+            "frozenset",
+            "int",
+            "isinstance",
+            "len",
+            "list",
+            "map",
+            "max",
+            "min",
+            "range",
+            "reversed",
+            "round",
+            "set",
+            "sorted",
+            "str",
+            "sum",
+            "tuple",
+            "zip",
+        )
+    },
+    "MediaTrackType": MediaTrackType,
+}
+
+# Syntax allowed in selector expressions. Anything else (lambdas, f-strings,
+# walrus assignments, etc.) is rejected.
+_selectorNodeTypes: tuple[type[ast.AST], ...] = (
+    # Values and names
+    ast.Expression,
+    ast.Constant,
+    ast.Name,
+    ast.Load,
+    ast.Store,
+    ast.Attribute,
+    ast.Subscript,
+    ast.Slice,
+    # Containers and comprehensions
+    ast.List,
+    ast.Tuple,
+    ast.Set,
+    ast.Dict,
+    ast.ListComp,
+    ast.SetComp,
+    ast.DictComp,
+    ast.GeneratorExp,
+    ast.comprehension,
+    # Operators
+    ast.BoolOp,
+    ast.And,
+    ast.Or,
+    ast.UnaryOp,
+    ast.Not,
+    ast.UAdd,
+    ast.USub,
+    ast.BinOp,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.FloorDiv,
+    ast.Mod,
+    ast.BitAnd,
+    ast.BitOr,
+    ast.BitXor,
+    ast.Invert,
+    ast.Compare,
+    ast.Eq,
+    ast.NotEq,
+    ast.Lt,
+    ast.LtE,
+    ast.Gt,
+    ast.GtE,
+    ast.Is,
+    ast.IsNot,
+    ast.In,
+    ast.NotIn,
+    ast.IfExp,
+    # f-strings (unlike `str.format`, these can't look up attributes by name)
+    ast.JoinedStr,
+    ast.FormattedValue,
+    # Calls (further restricted by `_checkSelectorNode`)
+    ast.Call,
+    ast.keyword,
+)
 
-        return {
-            # Convenience values
-            "track": self,
-            "id": self.ID or 0,
-            "lang": self.Language or "",
-            "title": self.Title or "",
-            "codec": self.CodecID or "",
-            # Generic flags
-            "isDefault": self.Default or False,
-            "isForced": self.Forced or "forced" in (self.Title or "").lower(),
-            "isVideo": self.Type == MediaTrackType.Video,
-            "isAudio": self.Type == MediaTrackType.Audio,
-            "isSubtitle": self.Type == MediaTrackType.Subtitles,
-            "isSubtitles": self.Type == MediaTrackType.Subtitles,
-            "isEnglish": (self.Language or "").lower() in ["en", "eng"],
-            "isCompatibility": "compatibility" in (self.Title or "").lower(),
-            # Video track flags
-            "isHEVC": "hevc" in (self.CodecID or "").lower(),
-            "isAVC": "avc" in (self.CodecID or "").lower(),
-            "isHDR": bool(hdrFormat.strip()),
-            "isDoVi": "dolby" in hdrFormat,
-            "isHDR10Plus": "hdr10+" in hdrFormat,
-            # Audio track flags
-            "isAAC": "aac" in (self.CodecID or "").lower(),
-            "isAC3": "_ac3" in (self.CodecID or "").lower(),
-            "isEAC3": "eac3" in (self.CodecID or "").lower(),
-            "isDTS": "dts" in (self.CodecID or "").lower(),
-            "isDTSHD": "dts-hd"
-            in (self.Format_Commercial_IfAny or "").lower(),
-            "isTrueHD": "truehd" in (self.CodecID or "").lower(),
-            # Subtitle track flags
-            "isText": (self.CodecID or "").lower().startswith("s_text"),
-            "isImage": (not (self.CodecID or "").lower().startswith("s_text")),
-            "isSDH": "sdh" in (self.Title or "").lower(),
-        }
+# String methods selector expressions may call on their values
+_selectorStringMethods: frozenset[str] = frozenset(
+    (
+        "casefold",
+        "count",
+        "endswith",
+        "find",
+        "isdigit",
+        "lower",
+        "lstrip",
+        "replace",
+        "rstrip",
+        "split",
+        "startswith",
+        "strip",
+        "upper",
+    )
+)
+
+# Attributes selector expressions may read from a `MediaTrackType` member
+_selectorTrackTypeAttributes: frozenset[str] = frozenset(("name", "value"))
+
+# Fields of `track` that selector expressions may read. These only hold plain
+# values, unlike the container reference.
+_selectorTrackFields: frozenset[str] = frozenset(
+    field.name
+    for field in dataclasses.fields(MediaTrack)
+    if field.name not in ("container", "_raw")
+)
+
+
+def _isSelectorTrackType(node: ast.AST) -> bool:
+    """Check if a selector node is `track.Type` or a `MediaTrackType` member."""
+    return (
+        isinstance(node, ast.Attribute)
+        and isinstance(node.value, ast.Name)
+        and (
+            (node.value.id == "track" and node.attr == "Type")
+            or (
+                node.value.id == "MediaTrackType"
+                and node.attr in MediaTrackType.__members__
+            )
+        )
+    )
+
+
+def _checkSelectorNode(node: ast.AST) -> typing.Optional[str]:
+    """
+    Check a single node of a selector expression's tree against the allowed
+    syntax. Returns the reason it is not allowed, or `None` if it is.
+
+    Private names are rejected. Attributes may only be fields of `track`,
+    members of `MediaTrackType` (and their `name` and `value`), or string
+    methods, so attribute chains can't lead off of `track` (e.g. to its
+    container). Only the available builtins and string methods may be called.
+    """
+    if not isinstance(node, _selectorNodeTypes):
+        return f"uses {type(node).__name__} syntax"
+
+    if isinstance(node, ast.Name) and node.id.startswith("_"):
+        return f"uses '{node.id}'"
+
+    if isinstance(node, ast.Attribute):
+        owner = node.value.id if isinstance(node.value, ast.Name) else None
+        if owner == "track":
+            allowedAttributes = _selectorTrackFields
+        elif owner == "MediaTrackType":
+            allowedAttributes = MediaTrackType.__members__.keys()
+        elif _isSelectorTrackType(node.value):
+            allowedAttributes = _selectorTrackTypeAttributes
+        else:
+            allowedAttributes = _selectorStringMethods
+        if node.attr not in allowedAttributes:
+            return f"uses attribute '{node.attr}'"
+
+    if isinstance(node, ast.Call):
+        function = node.func
+        if isinstance(function, ast.Name):
+            allowed = function.id in _selectorGlobals["__builtins__"]
+        elif isinstance(function, ast.Attribute):
+            allowed = function.attr in _selectorStringMethods
+        else:
+            allowed = False
+        if not allowed:
+            return "calls something other than a builtin or string method"
+
+    return None
+
+
+# Builders of the values available to track selector expressions, keyed by
+# name. Expressions only have the values they reference built for them.
+_selectorValueBuilders: dict[
+    str, typing.Callable[[MediaTrack], typing.Any]
+] = {
+    # Convenience values
+    "track": lambda track: track,
+    "id": lambda track: track.ID or 0,
+    "lang": lambda track: track.Language or "",
+    "title": lambda track: track.Title or "",
+    "codec": lambda track: track.CodecID or "",
+    # Generic flags
+    "isDefault": lambda track: track.Default or False,
+    "isForced": lambda track: track.Forced or "forced" in track._titleLower,
+    "isVideo": lambda track: track.Type is MediaTrackType.Video,
+    "isAudio": lambda track: track.Type is MediaTrackType.Audio,
+    "isSubtitle": lambda track: track.Type is MediaTrackType.Subtitles,
+    "isSubtitles": lambda track: track.Type is MediaTrackType.Subtitles,
+    "isEnglish": lambda track: (track.Language or "").lower()
+    in _englishLanguageCodes,
+    "isCompatibility": lambda track: "compatibility" in track._titleLower,
+    # Video and audio codec flags
+    **{
+        flag: (lambda track, needle=needle: needle in track._codecLower)
+        for flag, needle in _codecFlags
+    },
+    # Video track flags
+    "isHDR": lambda track: bool(track._hdrFormatLower.strip()),
+    "isDoVi": lambda track: "dolby" in track._hdrFormatLower,
+    "isHDR10Plus": lambda track: "hdr10+" in track._hdrFormatLower,
+    # Audio track flags
+    "isDTSHD": lambda track: "dts-hd"
+    in (track.Format_Commercial_IfAny or "").lower(),
+    # Subtitle track flags
+    "isText": lambda track: track._codecLower.startswith("s_text"),
+    "isImage": lambda track: not track._codecLower.startswith("s_text"),
+    "isSDH": lambda track: "sdh" in track._titleLower,
+}
+
+
+# Mapping of raw mediainfo keys to the `MediaTrack` fields they populate.
+# Valid field names come from the dataclass (except those set by `MediaFile`).
+# There are some field names with "@" that need to be mapped to different names
+_mediaTrackFieldMap: dict[str, str] = {
+    **{
+        field.name: field.name
+        for field in dataclasses.fields(MediaTrack)
+        if field.name not in ("container", "_raw")
+    },
+    "@type": "Type",
+    "@typeorder": "TypeOrder",
+}
+
+# Fields whose string values repeat across most tracks of a library (codecs,
+# languages, formats, etc.). These are interned, so that every track shares
+# one copy of each value instead of holding its own.
+_internedTrackFields: frozenset[str] = frozenset(
+    (
+        "BitDepth",
+        "BitRate_Mode",
+        "ChannelLayout",
+        "ChannelPositions",
+        "ChromaSubsampling",
+        "CodecID",
+        "CodecID_Compatible",
+        "ColorSpace",
+        "Compression_Mode",
+        "DisplayAspectRatio",
+        "Encoded_Application",
+        "Encoded_Library",
+        "Encoded_Library_Name",
+        "FileExtension",
+        "Format",
+        "Format_AdditionalFeatures",
+        "Format_Commercial_IfAny",
+        "Format_Level",
+        "Format_Profile",
+        "Format_Version",
+        "FrameRate_Mode",
+        "FrameRate_Mode_Original",
+        "HDR_Format",
+        "HDR_Format_Compatibility",
+        "HDR_Format_Level",
+        "HDR_Format_Profile",
+        "HDR_Format_Settings",
+        "HDR_Format_Version",
+        "Language",
+        "MasteringDisplay_ColorPrimaries",
+        "MasteringDisplay_ColorPrimaries_Source",
+        "MasteringDisplay_Luminance_Source",
+        "MaxCLL_Source",
+        "MaxFALL_Source",
+        "MuxingMode",
+        "OverallBitRate_Mode",
+        "ScanOrder",
+        "ScanType",
+        "ServiceKind",
+        "Standard",
+        "TimeCode_Source",
+    )
+)
 
 
 class MediaFile(object):
-    """Object representing a single media container file."""
+    """
+    Object representing a single media container file.
 
-    def __init__(self, path: pathlib.Path) -> None:
+    The raw mediainfo output of each track is only kept (as `MediaTrack._raw`)
+    if `keepRaw` is True. Otherwise it is released once the tracks are parsed.
+
+    The mediainfo output of recently opened files is kept in memory, so opening
+    an unchanged file again doesn't probe it again. If `useCache` is True, the
+    output is also read from (and saved to) a persistent cache at
+    `probeCachePath`, so this holds across processes too. Use `clearCache` to
+    empty both.
+    """
+
+    def __init__(
+        self,
+        path: pathlib.Path,
+        keepRaw: bool = False,
+        useCache: bool = False,
+    ) -> None:
         super().__init__()
 
         # Check that the path is valid
         self.path = path.absolute()
-        if not self.path.is_file():
+        try:
+            fileStat = self.path.stat()
+        except OSError:
+            fileStat = None
+        if fileStat is None or not stat.S_ISREG(fileStat.st_mode):
             raise RuntimeError(f"'{path}' is not a valid file path!")
 
         # Start by reading the file and decoding the JSON
-        infoCommand = mediainfo("--output=JSON", self.path)
-        assert isinstance(infoCommand, str)
-        if infoCommand is None:
+        infoOutput = _probeMediaInfoMemoized(self.path, fileStat, useCache)
+        if not infoOutput:
             raise RuntimeError(
                 "Error probing media container with mediainfo tool."
             )
-        parsedInfo = json.loads(infoCommand)
-
-        # List of valid field names comes from the dataclass
-        validFieldNames: list[str] = [
-            field.name for field in dataclasses.fields(MediaTrack)
-        ]
-
-        # There are some field names with "@" that need to be mapped to different names
-        # Also we prefer "Name" instead of "Title" for tracks.
-        fieldNameSubstitutions: dict[str, str] = {
-            "@type": "Type",
-            "@typeorder": "TypeOrder",
-        }
+        parsedInfo = loadJson(infoOutput)
 
         # Iterate through each track in the raw info, parse out irrelevant fields,
         # and create `MediaTrack` objects
         self.tracks: list[MediaTrack] = []
         for trackInfo in parsedInfo.get("media", {}).get("track", []):
-            acceptedFields = {}
-            for key in trackInfo:
-                sourceKey = destinationKey = key
-                if sourceKey in fieldNameSubstitutions:
-                    destinationKey = fieldNameSubstitutions[sourceKey]
-                if destinationKey not in validFieldNames:
-                    continue
-                acceptedFields[destinationKey] = trackInfo[sourceKey]
+            acceptedFields = {
+                _mediaTrackFieldMap[key]: value
+                for key, value in trackInfo.items()
+                if key in _mediaTrackFieldMap
+            }
+            for key in _internedTrackFields.intersection(acceptedFields):
+                if isinstance(value := acceptedFields[key], str):
+                    acceptedFields[key] = sys.intern(value)
             self.tracks.append(
-                MediaTrack(self, _raw=trackInfo, **acceptedFields)
+                MediaTrack(
+                    self,
+                    _raw=trackInfo if keepRaw else None,
+                    **acceptedFields,
+                )
             )
 
-        # Separate the meta info ('General' track) into its own object, if it exists
+        # Separate the meta info ('General' track) and chapters into their own
+        # objects, and group the remaining tracks by type, all in one pass.
         self.meta: typing.Optional[MediaTrack] = None
         self.chapters: list[MediaTrack] = []
-        for track in self.tracks:
+        self.tracksByType: dict[MediaTrackType, list[MediaTrack]] = {
+            MediaTrackType.Video: [],
+            MediaTrackType.Audio: [],
+            MediaTrackType.Subtitles: [],
+        }
+        allTracks, self.tracks = self.tracks, []
+        for track in allTracks:
             if track.Type is MediaTrackType.Metadata:
                 self.meta = track
-                self.tracks.remove(track)
+                continue
             elif track.Type is MediaTrackType.Chapters:
                 self.chapters.append(track)
-                self.tracks.remove(track)
+                continue
+            self.tracks.append(track)
+            if track.Type in self.tracksByType:
+                self.tracksByType[track.Type].append(track)
+
+    @classmethod
+    def openMany(
+        cls,
+        paths: typing.Iterable[pathlib.Path],
+        maxWorkers: typing.Optional[int] = None,
+        processes: bool = False,
+        useCache: bool = False,
+        executor: typing.Optional[concurrent.futures.Executor] = None,
+    ) -> list["MediaFile"]:
+        """
+        Open many media files at once, probing them concurrently.
 
-        # Generate list of tracks grouped by type
-        self.tracksByType: dict[MediaTrackType, list[MediaTrack]] = {
-            trackType: [
-                track for track in self.tracks if track.Type is trackType
-            ]
-            for trackType in [
-                MediaTrackType.Video,
-                MediaTrackType.Audio,
-                MediaTrackType.Subtitles,
-            ]
-        }
+        Each file is still probed separately (by libmediainfo, or its own
+        `mediainfo` process), but up to `maxWorkers` of them (defaults to the
+        CPU count) will run at the same time. Files are returned in the same
+        order as the input paths.
+
+        Probing is mostly waiting on reads of the container headers, so with
+        enough workers the storage becomes the limit. On slow or network
+        storage a `maxWorkers` above the CPU count can still help.
+
+        By default the files are opened from a thread pool. If `processes` is
+        True, a process pool is used instead, so that parsing the probe output
+        isn't serialized by the GIL. This only pays off for large batches, as
+        every opened file has to be pickled back to this process.
+
+        An existing `executor` can be given instead, so that repeated calls
+        (e.g. one per directory of a library scan) share a single pool rather
+        than starting a new one each time. It is left running afterwards, and
+        `maxWorkers` and `processes` are ignored.
+
+        `useCache` is passed on to each opened file.
+        """
+        openFile = functools.partial(cls, useCache=useCache)
+        if executor is not None:
+            return list(executor.map(openFile, paths))
+
+        executorClass: type[concurrent.futures.Executor] = (
+            concurrent.futures.ProcessPoolExecutor
+            if processes
+            else concurrent.futures.ThreadPoolExecutor
+        )
+        with executorClass(maxWorkers or os.cpu_count()) as executor:
+            return list(executor.map(openFile, paths))
+
+    @staticmethod
+    def clearCache() -> None:
+        """Delete all entries from the mediainfo output caches."""
+        with _probeMemoLock:
+            _probeMemo.clear()
+        probeCachePath.unlink(missing_ok=True)
 
     def extractTracks(
         self, tracks: list[tuple[MediaTrack, pathlib.Path]], fg: bool = True
@@ -493,8 +1119,13 @@ class MediaFile(object):
         - Each expression must return a boolean value.
         - `"all"` is a valid expression and will add or remove (why?) all tracks from the selection.
         - There are lots of pre-calculated boolean flags and other variables available
-          during evaluation of your expression. Inspect source code of this method
-          to learn all of the available variables.
+          during evaluation of your expression. Inspect `_selectorValueBuilders` in
+          the source code of this module to learn all of the available variables.
+        - Only simple expressions are allowed: comparisons, boolean and
+          arithmetic operators, containers and comprehensions. The only calls
+          allowed are a subset of builtins (`len`, `any`, `sorted`, etc.) and
+          string methods (`lower`, `startswith`, etc.). Of `track`, only its
+          plain fields can be read (e.g. `track.Width`).
         - Examples;
           - `+isEnglish`, include only english language tracks.
           - `+all:-isImage` or `+!isImage`, include only non-image subtitle tracks.
@@ -510,46 +1141,41 @@ class MediaFile(object):
             return trackList.copy()
 
         # The selector may also be a comma delimited list of track indexes and ranges.
-        if commaDelimitedNumbersPattern.match(selector):
-            indexedTracks: list[MediaTrack] = []
+        # Selections are tracked by `id()`, as comparing `MediaTrack` objects
+        # compares all of their fields.
+        indexArguments = _parseIndexSelector(selector)
+        if indexArguments is not None:
+            indexedTrackIds: set[int] = set()
 
             # Iterate through the arguments in the list
-            for argument in selector.split(","):
-                # If there is a colon character, the argument is a range
-                if ":" in argument:
-                    rangeStart, rangeEnd = (
-                        (int(s) if s else None) for s in argument.split(":")
-                    )
-                    for track in trackList[rangeStart:rangeEnd]:
-                        indexedTracks.append(track)
+            for argument in indexArguments:
+                # Ranges are parsed into slices
+                if isinstance(argument, slice):
+                    for track in trackList[argument]:
+                        indexedTrackIds.add(id(track))
 
                 # Else, it's just a index number
                 else:
-                    indexedTracks.append(trackList[int(argument)])
+                    indexedTrackIds.add(id(trackList[argument]))
 
-            return [track for track in trackList if track in indexedTracks]
+            return [
+                track for track in trackList if id(track) in indexedTrackIds
+            ]
 
         # Start with an empty list
         selectedTracks: list[MediaTrack] = []
+        selectedTrackIds: set[int] = set()
 
         # Split the selector string into a list of selector fragments
         selectorFragments = selector.split(":")
 
         # Iterate through each fragment consecutively and evaluate them
         for fragment in selectorFragments:
-            try:
-                fragmentMatch = trackSelectorFragmentPattern.match(fragment)
-
-                if fragmentMatch is None:
-                    raise RuntimeError(
-                        f"Could not parse selector fragment '{fragment}'. Re-examine your selector syntax."
-                    )
-
-                polarity, expression = fragmentMatch.groups()
-            except AttributeError:
-                raise RuntimeError(
-                    f"Could not parse selector fragment '{fragment}'. Re-examine your selector syntax."
-                )
+            # Split off the polarity operator, if the fragment starts with one
+            if fragment.startswith(("+", "-")):
+                polarity, expression = fragment[0], fragment[1:]
+            else:
+                polarity, expression = "", fragment
 
             filteredTracks: list[MediaTrack] = []
 
@@ -558,11 +1184,18 @@ class MediaFile(object):
 
             # Iterate through each track and apply the specified expression to filter
             else:
+                # Compile the expression once, rather than for every track.
+                # Only the selector values the expression references are built.
+                (
+                    selectorFunction,
+                    parameterNames,
+                ) = _compileSelectorExpression(expression)
+
                 for track in trackList:
                     # Evaluate the expression
                     try:
-                        evalResult = eval(
-                            expression, None, track.getSelectorValues()
+                        evalResult = selectorFunction(
+                            **track.getSelectorValues(parameterNames)
                         )
                     except Exception:
                         raise RuntimeError(
@@ -578,21 +1211,25 @@ class MediaFile(object):
                     if evalResult:
                         filteredTracks.append(track)
 
+            filteredTrackIds = {id(track) for track in filteredTracks}
+
             # If polarity is positive, add the filtered tracks into the selected tracks
             # list, in its original order.
             if not polarity or polarity == "+":
+                selectedTrackIds |= filteredTrackIds
                 selectedTracks = [
                     track
                     for track in trackList
-                    if (track in filteredTracks or track in selectedTracks)
+                    if id(track) in selectedTrackIds
                 ]
 
             # Else, filter the selected tracks list by the filtered tracks
             else:
+                selectedTrackIds -= filteredTrackIds
                 selectedTracks = [
                     track
                     for track in selectedTracks
-                    if track not in filteredTracks
+                    if id(track) in selectedTrackIds
                 ]
 
         return selectedTracks
@@ -614,22 +1251,29 @@ class SRTFile(MediaFile):
     containers. Using this special class will make their behavior more consistent.
     """
 
-    def __init__(self, path: pathlib.Path, language: str = "en") -> None:
-        super().__init__(path)
-
-        # If the subtitle track was not detected, generate a fake one.
+    def __init__(
+        self,
+        path: pathlib.Path,
+        language: str = "en",
+        keepRaw: bool = False,
+        useCache: bool = False,
+    ) -> None:
+        super().__init__(path, keepRaw, useCache)
+
+        # If the subtitle track was not detected, generate a fake one. It is
+        # also added to the type groupings, which were built when probing.
         if len(self.tracks) == 0:
-            self.tracks.append(
-                MediaTrack(
-                    self,
-                    _raw="",
-                    ID=1,
-                    UniqueID=str(hash(str(path))),
-                    Type=MediaTrackType.Subtitles,
-                    Format="SubRip",
-                    CodecID="S_TEXT/UTF8",
-                    Language=language,
-                    Default=True,
-                    Forced=False,
-                )
+            track = MediaTrack(
+                self,
+                _raw="",
+                ID=1,
+                UniqueID=str(hash(str(path))),
+                Type=MediaTrackType.Subtitles,
+                Format="SubRip",
+                CodecID="S_TEXT/UTF8",
+                Language=language,
+                Default="Yes",
+                Forced="No",
             )
+            self.tracks.append(track)
+            self.tracksByType[MediaTrackType.Subtitles].append(track)
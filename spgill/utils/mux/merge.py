@@ -204,9 +204,10 @@ class MergeJob:
     def _generateCommandArguments(self) -> list[str, pathlib.Path]:
         arguments: list[str, pathlib.Path] = []
 
-        # We need to track order of tracks and source containers
+        # We need to track order of tracks and source containers. Containers
+        # are mapped to their file index, so each track can look it up directly.
         absoluteTrackOrder: list[info.MediaTrack] = []
-        containerOrder: list[info.MediaFile] = []
+        containerOrder: dict[info.MediaFile, int] = {}
 
         # We first need to group all of the source tracks by their container file
         tracksByContainer: dict[
@@ -222,15 +223,13 @@ class MergeJob:
 
         # Iterate through each source container and generate all arguments
         for container, trackEntries in tracksByContainer.items():
-            # Sort the tracks by type
+            # Sort the tracks by type, in a single pass
             tracksByType: dict[info.MediaTrackType, list[MergeTrackEntry]] = {
-                trackType: [
-                    entry
-                    for entry in trackEntries
-                    if entry[0].Type is trackType
-                ]
-                for trackType in _argsByTrackType
+                trackType: [] for trackType in _argsByTrackType
             }
+            for entry in trackEntries:
+                if entry[0].Type in tracksByType:
+                    tracksByType[entry[0].Type].append(entry)
 
             # Iterate through each track type and generate arguments
             for trackType, trackEntries in tracksByType.items():
@@ -251,12 +250,12 @@ class MergeJob:
 
             # Append arguments for container
             arguments += self._generateContainerArguments(container)
-            containerOrder.append(container)
+            containerOrder[container] = len(containerOrder)
 
         # Generate and append the track order argument
         orderEntries: list[str] = []
         for track in absoluteTrackOrder:
-            fileId = containerOrder.index(track.container)
+            fileId = containerOrder[track.container]
             orderEntries.append(f"{fileId}:{track.ID}")
         arguments += ["--track-order", ",".join(orderEntries)]
 
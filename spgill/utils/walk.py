@@ -1,5 +1,6 @@
 ### stdlib imports
 from collections.abc import Iterable
+import os
 import pathlib
 import typing
 
@@ -33,22 +34,31 @@ def walk(
 
     Adapted from http://ominian.com/2016/03/29/os-walk-for-pathlib-path/
     """
-    topIterator = list(top.iterdir())
-    if sort:
-        topIterator = sorted(topIterator, reverse=reverse)
-
-    dirs = (node for node in topIterator if node.is_dir() is True)
-    nondirs = (node for node in topIterator if node.is_dir() is False)
+    # Directory entries from `os.scandir` already know their own type, so
+    # sorting them into dirs and nondirs (and finding the symlinked dirs)
+    # doesn't need a `stat` call per entry
+    dirs: list[pathlib.Path] = []
+    nondirs: list[pathlib.Path] = []
+    linkedDirs: set[pathlib.Path] = set()
+    with os.scandir(top) as entries:
+        for entry in entries:
+            path = top / entry.name
+            if entry.is_dir():
+                dirs.append(path)
+                if entry.is_symlink():
+                    linkedDirs.add(path)
+            else:
+                nondirs.append(path)
 
     if sort:
-        dirs = sorted(dirs, reverse=reverse)
-        nondirs = sorted(nondirs, reverse=reverse)
+        dirs.sort(reverse=reverse)
+        nondirs.sort(reverse=reverse)
 
     if topDown:
         yield top, dirs, nondirs
 
     for name in dirs:
-        if followLinks or name.is_symlink() is False:
+        if followLinks or name not in linkedDirs:
             for x in walk(
                 name,
                 topDown=topDown,
@@ -98,12 +108,20 @@ def find_files_by_suffix(
     # If sorting is requested, yield from self via a sorted function
     if sort:
         yield from sorted(
-            find_files_by_suffix(sources, suffixes=suffixes, sort=False)
+            find_files_by_suffix(
+                sources,
+                suffixes=suffixes,
+                recurse=recurse,
+                sort=False,
+                prevent_duplicates=prevent_duplicates,
+            )
         )
         return
 
-    # If no suffixes were given, we default to yielding all files
+    # If no suffixes were given, we default to yielding all files. Otherwise
+    # they're collected into a set for quicker lookups.
     all_files = not suffixes
+    suffix_set = frozenset(suffixes or ())
 
     # Track a set of the yielded files so we don't yield duplicates
     yielded_files: set[pathlib.Path] = set()
@@ -111,7 +129,7 @@ def find_files_by_suffix(
     for source in sources:
         # If the source is a file itself, we can consider it for yielding
         if source.is_file():
-            if all_files or source.suffix in suffixes:
+            if all_files or source.suffix in suffix_set:
                 if prevent_duplicates:
                     resolved_source = source.resolve()
                     if resolved_source not in yielded_files:
@@ -125,7 +143,7 @@ def find_files_by_suffix(
         elif recurse:
             for *_, sub_files in walk(source):
                 for file in sub_files:
-                    if all_files or file.suffix in suffixes:
+                    if all_files or file.suffix in suffix_set:
                         if prevent_duplicates:
                             resolved_file = file.resolve()
                             if resolved_file not in yielded_files:
@@ -137,7 +155,7 @@ def find_files_by_suffix(
         # Else, we'll simply iterate through the directory's contents
         else:
             for path in source.iterdir():
-                if path.is_file() and (all_files or path.suffix in suffixes):
+                if path.is_file() and (all_files or path.suffix in suffix_set):
                     if prevent_duplicates:
                         resolved_path = path.resolve()
                         if resolved_path not in yielded_files: